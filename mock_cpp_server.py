@@ -4,13 +4,65 @@ OneStopRadio C++ Media Server Mock - Python Implementation
 Provides HTTP endpoints that the frontend expects for the C++ backend service
 """
 
+import copy
 import json
+import logging
+import re
 import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
-import urllib.parse as urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from datetime import datetime
 import threading
-import random
+from random import random as _rand, randint as _randint
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+    
+    def _dumps(data, pretty=False):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+else:
+    _loads = json.loads
+    
+    def _dumps(data, pretty=False):
+        if pretty:
+            return json.dumps(data, indent=2).encode('utf-8')
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, every client then gets JSON
+    msgpack = None
+
+# The most specific range that matches a JSON response sets its quality
+_JSON_RANGES = ('application/json', 'application/*', '*/*')
+
+def prefers_msgpack(accept):
+    """Whether an Accept header ranks application/msgpack at least as high as JSON"""
+    accept = accept.lower()
+    if 'msgpack' not in accept:
+        return False
+    qualities = {}
+    for media_range in accept.split(','):
+        media_type, *params = media_range.split(';')
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.strip()
+        qualities[media_type] = max(q, qualities.get(media_type, 0.0))
+    msgpack_q = qualities.get('application/msgpack', 0.0)
+    json_q = next((qualities[r] for r in _JSON_RANGES if r in qualities), 0.0)
+    return msgpack_q > 0.0 and msgpack_q >= json_q
+
+logger = logging.getLogger(__name__)
 
 # Mock server state
 server_state = {
@@ -19,25 +71,18 @@ server_state = {
     'start_time': time.time(),
     'mixer': {
         'crossfader': 0.5,
-        'master_volume': 0.8,
-        'channels': [
-            {
-                'id': 1,
-                'volume': 0.7,
-                'loaded_track': None,
-                'is_playing': False,
-                'position': 0.0,
-                'eq': {'low': 0.0, 'mid': 0.0, 'high': 0.0}
-            },
-            {
-                'id': 2,
-                'volume': 0.7,
-                'loaded_track': None,
-                'is_playing': False,
-                'position': 0.0,
-                'eq': {'low': 0.0, 'mid': 0.0, 'high': 0.0}
-            }
-        ]
+        'master_volume': 0.8
+    },
+    # One list per field, indexed by channel; channels_view() rebuilds the
+    # per-channel dicts that go out on the wire
+    'channels': {
+        'volume': [0.7, 0.7],
+        'loaded_track': [None, None],
+        'is_playing': [False, False],
+        'position': [0.0, 0.0],
+        'eq_low': [0.0, 0.0],
+        'eq_mid': [0.0, 0.0],
+        'eq_high': [0.0, 0.0]
     },
     'microphone': {
         'enabled': False,
@@ -56,295 +101,591 @@ server_state = {
     }
 }
 
+# Requests are served on worker threads, so every update to server_state
+# happens while holding this lock
+state_lock = threading.Lock()
+
+def channels_view(state=server_state):
+    """Build the list of per-channel dicts used in JSON responses"""
+    ch = state['channels']
+    return [
+        {
+            'id': i + 1,
+            'volume': ch['volume'][i],
+            'loaded_track': ch['loaded_track'][i],
+            'is_playing': ch['is_playing'][i],
+            'position': ch['position'][i],
+            'eq': {'low': ch['eq_low'][i], 'mid': ch['eq_mid'][i], 'high': ch['eq_high'][i]}
+        }
+        for i in range(len(ch['volume']))
+    ]
+
+# /api/mixer/status has a fixed schema, so its body is rendered straight from
+# a bytes template instead of walking nested dicts through the JSON encoder.
+# Floats go through %a, i.e. repr(), which round-trips exactly like the
+# encoder does
+_CHANNEL_TMPL = (b'"volume":%a,"loaded_track":%s,"is_playing":%s,"position":%a,'
+                 b'"eq":{"low":%a,"mid":%a,"high":%a}')
+_STATUS_TMPL = (
+    b'{"success":true,"mixer":{"crossfader":%a,"master_volume":%a,"channels":['
+    b'{"id":1,' + _CHANNEL_TMPL + b'},{"id":2,' + _CHANNEL_TMPL + b'}]},'
+    b'"audio_levels":{"master_left":%a,"master_right":%a,'
+    b'"channel_1_left":%a,"channel_1_right":%a,'
+    b'"channel_2_left":%a,"channel_2_right":%a,"microphone":%a}}'
+)
+_JSON_BOOL = (b'false', b'true')
+
+def mixer_status_data(state=server_state):
+    """Build the /api/mixer/status response as dicts, for non-JSON encoders"""
+    return {
+        'success': True,
+        'mixer': dict(state['mixer'], channels=channels_view(state)),
+        'audio_levels': dict(state['audio_levels'])
+    }
+
+def mixer_status_body(state=server_state):
+    """Render the /api/mixer/status response body from the current state"""
+    mixer = state['mixer']
+    ch = state['channels']
+    levels = state['audio_levels']
+    args = [mixer['crossfader'], mixer['master_volume']]
+    for i in (0, 1):
+        args += (
+            ch['volume'][i], _dumps(ch['loaded_track'][i]), _JSON_BOOL[ch['is_playing'][i]],
+            ch['position'][i], ch['eq_low'][i], ch['eq_mid'][i], ch['eq_high'][i]
+        )
+    args += (
+        levels['master_left'], levels['master_right'],
+        levels['channel_1_left'], levels['channel_1_right'],
+        levels['channel_2_left'], levels['channel_2_right'],
+        levels['microphone']
+    )
+    return _STATUS_TMPL % tuple(args)
+
+# Fail at startup, not on the first poll, if the template and the state
+# layout drift apart or the template stops round-tripping values exactly.
+# The initial state only holds short decimals, so check a probe copy too
+_probe_state = copy.deepcopy(server_state)
+_probe_state['mixer']['crossfader'] = 0.123456789
+_probe_state['channels']['loaded_track'][1] = 'Probe "Track"'
+_probe_state['channels']['is_playing'][1] = True
+_probe_state['channels']['position'][0] = 1 / 3
+_probe_state['audio_levels']['microphone'] = 1e-05
+for _state in (server_state, _probe_state):
+    if _loads(mixer_status_body(_state)) != mixer_status_data(_state):
+        raise RuntimeError('_STATUS_TMPL does not match the server_state layout')
+del _probe_state, _state
+
+# Uptime and the health-check timestamp only have one-second resolution,
+# so both are refreshed at most once per wall-clock second
+_last_ts_sec = 0
+_last_ts_iso = b''
+
+def _refresh_clock():
+    """Update uptime and the cached ISO timestamp when the second changes"""
+    global _last_ts_sec, _last_ts_iso
+    now = int(time.time())
+    if now != _last_ts_sec:
+        with state_lock:
+            server_state['uptime'] = int(now - server_state['start_time'])
+        _last_ts_iso = datetime.fromtimestamp(now).isoformat().encode('ascii')
+        _last_ts_sec = now
+
 class MockCppHandler(BaseHTTPRequestHandler):
     
+    # Keep connections open between polls; every response sends Content-Length
+    protocol_version = 'HTTP/1.1'
+    
+    # Small replies on a kept-alive connection must not wait on Nagle's
+    # algorithm; StreamRequestHandler.setup() sets TCP_NODELAY for us
+    disable_nagle_algorithm = True
+    
+    # Responses are compact JSON unless the request asks for ?pretty=1
+    pretty = False
+    
+    # Set per request from the Accept header when msgpack is installed
+    use_msgpack = False
+    
+    # The preflight reply never changes, so the whole response is one blob
+    # carrying the same CORS headers send_json_response() sends
+    _OPTIONS_RESPONSE = (('%s 200 OK\r\n' % protocol_version).encode('ascii')
+                         + b'Access-Control-Allow-Origin: *\r\n'
+                         b'Access-Control-Allow-Methods: GET, POST, PUT, DELETE, OPTIONS\r\n'
+                         b'Access-Control-Allow-Headers: Content-Type, Authorization\r\n'
+                         b'Content-Length: 0\r\n\r\n')
+    
+    # Bodies whose shape never changes are serialized once at import time;
+    # the dicts are kept for MessagePack clients
+    _HEALTH = {'status': 'ok', 'service': 'C++ Media Server Mock', 'version': '1.0.0'}
+    _HEALTH_TMPL = _dumps(_HEALTH)[:-1] + b',"uptime":%d,"timestamp":"%s"}'
+    _NOT_FOUND = {
+        'success': False,
+        'error': 'Endpoint not found',
+        'available_endpoints': [
+            'GET /api/health - Server health check',
+            'GET /api/stats - Server statistics',
+            'GET /api/mixer/status - Mixer status and levels',
+            'GET /api/mixer/microphone/status - Microphone status',
+            'GET /api/audio/levels - Real-time audio levels',
+            'GET /api/state - Mixer, microphone and audio levels in one response',
+            'POST /api/mixer/crossfader - Set crossfader position',
+            'POST /api/mixer/channel/{id}/volume - Set channel volume',
+            'POST /api/mixer/channel/{id}/load - Load track to channel',
+            'POST /api/mixer/channel/{id}/playback - Control playback',
+            'POST /api/mixer/microphone/toggle - Toggle microphone',
+            'POST /api/mixer/microphone/start - Start microphone',
+            'POST /api/mixer/microphone/stop - Stop microphone',
+            'POST /api/mixer/microphone/gain - Set microphone gain',
+            'POST /api/mixer/master/volume - Set master volume'
+        ]
+    }
+    _NOT_FOUND_BODY = _dumps(_NOT_FOUND)
+    _ENCODE_ERROR_BODY = _dumps({
+        'success': False,
+        'error': 'Could not encode response'
+    })
+    
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-        self.end_headers()
+        self.wfile.write(self._OPTIONS_RESPONSE)
     
     def do_GET(self):
         """Handle GET requests"""
-        parsed_path = urlparse.urlparse(self.path)
-        path = parsed_path.path
+        path, _, query = self.path.partition('?')
+        self.pretty = 'pretty=1' in query.split('&')
+        self.use_msgpack = msgpack is not None and prefers_msgpack(self.headers.get('Accept', ''))
         
-        print(f"🎛️ GET {path}")
+        logger.debug("🎛️ GET %s", path)
         
         # Update uptime
-        server_state['uptime'] = int(time.time() - server_state['start_time'])
+        _refresh_clock()
         
-        if path == '/api/health':
-            self.send_json_response({
-                'status': 'ok',
-                'service': 'C++ Media Server Mock',
-                'version': '1.0.0',
-                'uptime': server_state['uptime'],
-                'timestamp': datetime.now().isoformat()
-            })
-            
-        elif path == '/api/stats':
-            self.send_json_response({
-                'success': True,
-                'stats': {
-                    'uptime': server_state['uptime'],
-                    'cpu_usage': round(random.uniform(10, 30), 1),
-                    'memory_usage': round(random.uniform(40, 80), 1),
-                    'audio_buffer_health': 'good',
-                    'active_connections': random.randint(0, 5)
-                }
-            })
-            
-        elif path == '/api/mixer/status':
-            # Simulate realistic audio levels
-            if server_state['mixer']['channels'][0]['is_playing']:
-                server_state['audio_levels']['channel_1_left'] = random.uniform(0.3, 0.9)
-                server_state['audio_levels']['channel_1_right'] = random.uniform(0.3, 0.9)
-            else:
-                server_state['audio_levels']['channel_1_left'] = 0.0
-                server_state['audio_levels']['channel_1_right'] = 0.0
-                
-            if server_state['mixer']['channels'][1]['is_playing']:
-                server_state['audio_levels']['channel_2_left'] = random.uniform(0.3, 0.9)
-                server_state['audio_levels']['channel_2_right'] = random.uniform(0.3, 0.9)
-            else:
-                server_state['audio_levels']['channel_2_left'] = 0.0
-                server_state['audio_levels']['channel_2_right'] = 0.0
-                
-            # Master levels based on crossfader and channel volumes
-            crossfader = server_state['mixer']['crossfader']
-            ch1_vol = server_state['mixer']['channels'][0]['volume']
-            ch2_vol = server_state['mixer']['channels'][1]['volume']
-            master_vol = server_state['mixer']['master_volume']
-            
-            # Simple crossfader calculation
-            ch1_output = server_state['audio_levels']['channel_1_left'] * ch1_vol * (1.0 - crossfader) * master_vol
-            ch2_output = server_state['audio_levels']['channel_2_left'] * ch2_vol * crossfader * master_vol
-            server_state['audio_levels']['master_left'] = max(ch1_output, ch2_output)
-            server_state['audio_levels']['master_right'] = max(ch1_output, ch2_output)
-            
-            self.send_json_response({
-                'success': True,
-                'mixer': server_state['mixer'],
-                'audio_levels': server_state['audio_levels']
-            })
-            
-        elif path == '/api/mixer/microphone/status':
-            self.send_json_response({
-                'success': True,
-                'microphone': server_state['microphone']
-            })
-            
-        elif path == '/api/audio/levels':
-            self.send_json_response({
-                'success': True,
-                'levels': server_state['audio_levels']
-            })
-            
+        handler = self._GET_ROUTES.get(path)
+        if handler is None:
+            self.send_json_response(self._NOT_FOUND if self.use_msgpack else self._NOT_FOUND_BODY,
+                                    status_code=404)
         else:
-            self.send_json_response({
-                'success': False,
-                'error': 'Endpoint not found',
-                'available_endpoints': [
-                    'GET /api/health - Server health check',
-                    'GET /api/stats - Server statistics',
-                    'GET /api/mixer/status - Mixer status and levels',
-                    'GET /api/mixer/microphone/status - Microphone status',
-                    'GET /api/audio/levels - Real-time audio levels',
-                    'POST /api/mixer/crossfader - Set crossfader position',
-                    'POST /api/mixer/channel/{id}/volume - Set channel volume',
-                    'POST /api/mixer/channel/{id}/load - Load track to channel',
-                    'POST /api/mixer/channel/{id}/playback - Control playback',
-                    'POST /api/mixer/microphone/toggle - Toggle microphone'
-                ]
-            }, status_code=404)
+            handler(self)
     
     def do_POST(self):
         """Handle POST requests"""
-        parsed_path = urlparse.urlparse(self.path)
-        path = parsed_path.path
+        path, _, query = self.path.partition('?')
+        self.pretty = 'pretty=1' in query.split('&')
+        self.use_msgpack = msgpack is not None and prefers_msgpack(self.headers.get('Accept', ''))
         
-        print(f"🎛️ POST {path}")
+        logger.debug("🎛️ POST %s", path)
+        
+        # A body framed by Transfer-Encoding is never read here; on a kept-alive
+        # connection its bytes would be parsed as the next request
+        if 'Transfer-Encoding' in self.headers and 'Content-Length' not in self.headers:
+            self.close_connection = True
+            self.send_json_response({
+                'success': False,
+                'error': 'Content-Length required'
+            }, status_code=411)
+            return
         
         # Read request body
         content_length = int(self.headers.get('Content-Length', 0))
         body = {}
         if content_length > 0:
             try:
-                body_raw = self.rfile.read(content_length)
-                body = json.loads(body_raw.decode('utf-8'))
-            except:
-                pass
+                body = _loads(self.rfile.read(content_length))
+            except ValueError:  # orjson.JSONDecodeError is a ValueError too
+                body = None
+            if not isinstance(body, dict):
+                self.send_invalid_body()
+                return
         
-        if path == '/api/mixer/crossfader':
-            value = body.get('value', 0.5)
-            server_state['mixer']['crossfader'] = max(0.0, min(1.0, float(value)))
-            print(f"🎚️ Crossfader set to {server_state['mixer']['crossfader']}")
-            
-            self.send_json_response({
-                'success': True,
-                'action': 'crossfader_set',
-                'value': server_state['mixer']['crossfader']
-            })
-            
-        elif path.startswith('/api/mixer/channel/') and path.endswith('/volume'):
-            # Extract channel ID
-            parts = path.split('/')
-            try:
-                channel_id = int(parts[4]) - 1  # Convert to 0-based index
-                if 0 <= channel_id < 2:
-                    value = body.get('value', 0.7)
-                    server_state['mixer']['channels'][channel_id]['volume'] = max(0.0, min(1.0, float(value)))
-                    print(f"🔊 Channel {channel_id + 1} volume set to {server_state['mixer']['channels'][channel_id]['volume']}")
-                    
-                    self.send_json_response({
-                        'success': True,
-                        'action': 'channel_volume_set',
-                        'channel': channel_id + 1,
-                        'value': server_state['mixer']['channels'][channel_id]['volume']
-                    })
-                else:
-                    self.send_json_response({
-                        'success': False,
-                        'error': 'Invalid channel ID'
-                    }, status_code=400)
-            except (ValueError, IndexError):
-                self.send_json_response({
-                    'success': False,
-                    'error': 'Invalid channel ID in path'
-                }, status_code=400)
-                
-        elif path.startswith('/api/mixer/channel/') and path.endswith('/load'):
-            # Extract channel ID
-            parts = path.split('/')
-            try:
-                channel_id = int(parts[4]) - 1  # Convert to 0-based index
-                if 0 <= channel_id < 2:
-                    track_name = body.get('name', f'Track_{int(time.time())}')
-                    server_state['mixer']['channels'][channel_id]['loaded_track'] = track_name
-                    server_state['mixer']['channels'][channel_id]['position'] = 0.0
-                    print(f"💿 Track '{track_name}' loaded to Channel {channel_id + 1}")
-                    
-                    self.send_json_response({
-                        'success': True,
-                        'action': 'track_loaded',
-                        'channel': channel_id + 1,
-                        'track': track_name
-                    })
-                else:
-                    self.send_json_response({
-                        'success': False,
-                        'error': 'Invalid channel ID'
-                    }, status_code=400)
-            except (ValueError, IndexError):
-                self.send_json_response({
-                    'success': False,
-                    'error': 'Invalid channel ID in path'
-                }, status_code=400)
-                
-        elif path.startswith('/api/mixer/channel/') and path.endswith('/playback'):
-            # Extract channel ID
-            parts = path.split('/')
-            try:
-                channel_id = int(parts[4]) - 1  # Convert to 0-based index
-                if 0 <= channel_id < 2:
-                    action = body.get('action', 'play')  # play, pause, stop
-                    
-                    if action == 'play':
-                        server_state['mixer']['channels'][channel_id]['is_playing'] = True
-                        print(f"▶️ Channel {channel_id + 1} playing")
-                    elif action == 'pause':
-                        server_state['mixer']['channels'][channel_id]['is_playing'] = False
-                        print(f"⏸️ Channel {channel_id + 1} paused")
-                    elif action == 'stop':
-                        server_state['mixer']['channels'][channel_id]['is_playing'] = False
-                        server_state['mixer']['channels'][channel_id]['position'] = 0.0
-                        print(f"⏹️ Channel {channel_id + 1} stopped")
-                    
-                    self.send_json_response({
-                        'success': True,
-                        'action': f'playback_{action}',
-                        'channel': channel_id + 1,
-                        'is_playing': server_state['mixer']['channels'][channel_id]['is_playing']
-                    })
-                else:
-                    self.send_json_response({
-                        'success': False,
-                        'error': 'Invalid channel ID'
-                    }, status_code=400)
-            except (ValueError, IndexError):
-                self.send_json_response({
-                    'success': False,
-                    'error': 'Invalid channel ID in path'
-                }, status_code=400)
-                
-        elif path == '/api/mixer/microphone/toggle':
-            server_state['microphone']['enabled'] = not server_state['microphone']['enabled']
-            print(f"🎤 Microphone {'ON' if server_state['microphone']['enabled'] else 'OFF'}")
-            
-            self.send_json_response({
-                'success': True,
-                'action': 'microphone_toggle',
-                'enabled': server_state['microphone']['enabled']
-            })
-            
-        elif path == '/api/mixer/master/volume':
-            value = body.get('value', 0.8)
-            server_state['mixer']['master_volume'] = max(0.0, min(1.0, float(value)))
-            print(f"🔊 Master volume set to {server_state['mixer']['master_volume']}")
-            
+        handler = self._POST_ROUTES.get(path)
+        if handler is not None:
+            handler(self, body)
+            return
+        
+        match = self._CHANNEL_RE.match(path)
+        if match is not None:
+            channel_id = ord(match.group(1)) - ord('1')  # Convert to 0-based index
+            self._CHANNEL_ROUTES[match.group(2)](self, channel_id, body)
+        elif path.startswith('/api/mixer/channel/') and path.endswith(('/volume', '/load', '/playback')):
             self.send_json_response({
-                'success': True,
-                'action': 'master_volume_set',
-                'value': server_state['mixer']['master_volume']
-            })
-            
+                'success': False,
+                'error': 'Invalid channel ID'
+            }, status_code=400)
         else:
             self.send_json_response({
                 'success': False,
                 'error': f'POST endpoint not implemented: {path}'
             }, status_code=404)
     
+    # GET handlers
+    
+    def _get_health(self):
+        if self.use_msgpack:
+            self.send_json_response(dict(self._HEALTH, uptime=server_state['uptime'],
+                                         timestamp=_last_ts_iso.decode('ascii')))
+        else:
+            self.send_json_response(self._HEALTH_TMPL % (server_state['uptime'], _last_ts_iso))
+    
+    def _get_stats(self):
+        self.send_json_response({
+            'success': True,
+            'stats': {
+                'uptime': server_state['uptime'],
+                'cpu_usage': round(10 + 20 * _rand(), 1),
+                'memory_usage': round(40 + 40 * _rand(), 1),
+                'audio_buffer_health': 'good',
+                'active_connections': _randint(0, 5)
+            }
+        })
+    
+    def _get_mixer_status(self):
+        # Simulate realistic audio levels
+        with state_lock:
+            self.simulate_audio_levels()
+            body = mixer_status_data() if self.use_msgpack else mixer_status_body()
+        
+        self.send_json_response(body)
+    
+    def _get_microphone_status(self):
+        self.send_json_response({
+            'success': True,
+            'microphone': server_state['microphone']
+        })
+    
+    def _get_audio_levels(self):
+        self.send_json_response({
+            'success': True,
+            'levels': server_state['audio_levels']
+        })
+    
+    def _get_state(self):
+        # Everything the mixer UI refreshes per tick, in one round-trip
+        with state_lock:
+            self.simulate_audio_levels()
+            state = {
+                'success': True,
+                'mixer': dict(server_state['mixer'], channels=channels_view()),
+                'microphone': dict(server_state['microphone']),
+                'audio_levels': dict(server_state['audio_levels'])
+            }
+        
+        self.send_json_response(state)
+    
+    # POST handlers
+    
+    def _post_crossfader(self, body):
+        try:
+            value = max(0.0, min(1.0, float(body.get('value', 0.5))))
+        except (TypeError, ValueError, OverflowError):
+            self.send_invalid_value()
+            return
+        with state_lock:
+            server_state['mixer']['crossfader'] = value
+        logger.debug("🎚️ Crossfader set to %s", server_state['mixer']['crossfader'])
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'crossfader_set',
+            'value': server_state['mixer']['crossfader']
+        })
+    
+    def _post_microphone_toggle(self, body):
+        with state_lock:
+            server_state['microphone']['enabled'] = not server_state['microphone']['enabled']
+        logger.debug("🎤 Microphone %s", 'ON' if server_state['microphone']['enabled'] else 'OFF')
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'microphone_toggle',
+            'enabled': server_state['microphone']['enabled']
+        })
+    
+    def _post_microphone_start(self, body):
+        gain = body.get('gain', 75.0)
+        try:
+            normalized_gain = max(0.0, min(100.0, float(gain))) / 100.0
+        except (TypeError, ValueError, OverflowError):
+            self.send_invalid_value()
+            return
+        with state_lock:
+            server_state['microphone']['enabled'] = True
+            server_state['microphone']['gain'] = normalized_gain
+            server_state['microphone']['talkover'] = True  # Auto-enable talkover
+        logger.debug("🎤 Microphone STARTED - Gain: %s%% - Talkover: ON", gain)
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'microphone_started',
+            'gain': gain,
+            'talkover_enabled': True,
+            'message': 'Microphone started with auto-talkover'
+        })
+    
+    def _post_microphone_stop(self, body):
+        with state_lock:
+            server_state['microphone']['enabled'] = False
+            server_state['microphone']['talkover'] = False
+        logger.debug("🎤 Microphone STOPPED - Talkover: OFF")
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'microphone_stopped',
+            'talkover_enabled': False,
+            'message': 'Microphone stopped, talkover disabled'
+        })
+    
+    def _post_microphone_gain(self, body):
+        gain = body.get('gain', 75.0)
+        try:
+            normalized_gain = max(0.0, min(100.0, float(gain))) / 100.0
+        except (TypeError, ValueError, OverflowError):
+            self.send_invalid_value()
+            return
+        with state_lock:
+            server_state['microphone']['gain'] = normalized_gain
+        logger.debug("🎤 Microphone gain set to %s%%", gain)
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'microphone_gain_set',
+            'gain': gain,
+            'normalized_gain': server_state['microphone']['gain']
+        })
+    
+    def _post_master_volume(self, body):
+        try:
+            value = max(0.0, min(1.0, float(body.get('value', 0.8))))
+        except (TypeError, ValueError, OverflowError):
+            self.send_invalid_value()
+            return
+        with state_lock:
+            server_state['mixer']['master_volume'] = value
+        logger.debug("🔊 Master volume set to %s", server_state['mixer']['master_volume'])
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'master_volume_set',
+            'value': server_state['mixer']['master_volume']
+        })
+    
+    # Channel POST handlers, called with a validated 0-based channel index
+    
+    def _post_channel_volume(self, channel_id, body):
+        try:
+            value = max(0.0, min(1.0, float(body.get('value', 0.7))))
+        except (TypeError, ValueError, OverflowError):
+            self.send_invalid_value()
+            return
+        with state_lock:
+            server_state['channels']['volume'][channel_id] = value
+        logger.debug("🔊 Channel %d volume set to %s", channel_id + 1, server_state['channels']['volume'][channel_id])
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'channel_volume_set',
+            'channel': channel_id + 1,
+            'value': server_state['channels']['volume'][channel_id]
+        })
+    
+    def _post_channel_load(self, channel_id, body):
+        track_name = body.get('name', f'Track_{int(time.time())}')
+        if not isinstance(track_name, str):
+            # The name is stored and echoed by every status poll, so anything
+            # the encoders might refuse (deep nesting, huge ints) stays out
+            self.send_invalid_value()
+            return
+        with state_lock:
+            server_state['channels']['loaded_track'][channel_id] = track_name
+            server_state['channels']['position'][channel_id] = 0.0
+        logger.debug("💿 Track '%s' loaded to Channel %d", track_name, channel_id + 1)
+        
+        self.send_json_response({
+            'success': True,
+            'action': 'track_loaded',
+            'channel': channel_id + 1,
+            'track': track_name
+        })
+    
+    def _post_channel_playback(self, channel_id, body):
+        action = body.get('action', 'play')  # play, pause, stop
+        
+        with state_lock:
+            if action == 'play':
+                server_state['channels']['is_playing'][channel_id] = True
+                logger.debug("▶️ Channel %d playing", channel_id + 1)
+            elif action == 'pause':
+                server_state['channels']['is_playing'][channel_id] = False
+                logger.debug("⏸️ Channel %d paused", channel_id + 1)
+            elif action == 'stop':
+                server_state['channels']['is_playing'][channel_id] = False
+                server_state['channels']['position'][channel_id] = 0.0
+                logger.debug("⏹️ Channel %d stopped", channel_id + 1)
+        
+        self.send_json_response({
+            'success': True,
+            'action': f'playback_{action}',
+            'channel': channel_id + 1,
+            'is_playing': server_state['channels']['is_playing'][channel_id]
+        })
+    
+    def simulate_audio_levels(self):
+        """Simulate realistic audio levels"""
+        mixer = server_state['mixer']
+        microphone = server_state['microphone']
+        channels = server_state['channels']
+        playing = channels['is_playing']
+        volume = channels['volume']
+        
+        # Draw every sample up front, silent sources stay at zero
+        if microphone['enabled']:
+            mic = (0.3 + 0.5 * _rand()) * microphone['gain']
+        else:
+            mic = 0.0
+        left = [0.3 + 0.6 * _rand() if p else 0.0 for p in playing]
+        right = [0.3 + 0.6 * _rand() if p else 0.0 for p in playing]
+        
+        # Master levels based on crossfader, channel volumes and the mic.
+        # The port 8082 server runs this same model, so its master is
+        # crossfader-weighted too (halved at the centre position) where its
+        # old standalone copy ignored the crossfader
+        crossfader = mixer['crossfader']
+        master = max(
+            left[0] * volume[0] * (1.0 - crossfader),
+            left[1] * volume[1] * crossfader,
+            mic
+        ) * mixer['master_volume']
+        
+        # Publish all levels in one update
+        server_state['audio_levels'].update(
+            master_left=master,
+            master_right=master,
+            channel_1_left=left[0],
+            channel_1_right=right[0],
+            channel_2_left=left[1],
+            channel_2_right=right[1],
+            microphone=mic
+        )
+    
+    # Route tables: exact paths map straight to their handler, and the
+    # /api/mixer/channel/{id}/{action} family is matched with a single regex
+    # that only accepts the two valid channel ids
+    _GET_ROUTES = {
+        '/api/health': _get_health,
+        '/api/stats': _get_stats,
+        '/api/mixer/status': _get_mixer_status,
+        '/api/mixer/microphone/status': _get_microphone_status,
+        '/api/audio/levels': _get_audio_levels,
+        '/api/state': _get_state,
+    }
+    _POST_ROUTES = {
+        '/api/mixer/crossfader': _post_crossfader,
+        '/api/mixer/microphone/toggle': _post_microphone_toggle,
+        '/api/mixer/microphone/start': _post_microphone_start,
+        '/api/mixer/microphone/stop': _post_microphone_stop,
+        '/api/mixer/microphone/gain': _post_microphone_gain,
+        '/api/mixer/master/volume': _post_master_volume,
+    }
+    _CHANNEL_RE = re.compile(r'^/api/mixer/channel/([12])/(volume|load|playback)$')
+    _CHANNEL_ROUTES = {
+        'volume': _post_channel_volume,
+        'load': _post_channel_load,
+        'playback': _post_channel_playback,
+    }
+    
     def send_json_response(self, data, status_code=200):
-        """Send JSON response with CORS headers"""
+        """Send JSON response with CORS headers
+        
+        data may also be an already serialized JSON body (bytes), which is
+        written as-is unless pretty output was requested. Clients whose
+        Accept header prefers application/msgpack get a MessagePack body
+        instead when the msgpack package is installed; handlers pass dicts,
+        never pre-serialized bytes, for those requests.
+        """
+        content_type = 'application/json'
+        try:
+            if self.use_msgpack:
+                body = msgpack.packb(data, use_bin_type=True)
+                content_type = 'application/msgpack'
+            elif isinstance(data, bytes):
+                body = _dumps(_loads(data), pretty=True) if self.pretty else data
+            else:
+                body = _dumps(data, pretty=self.pretty)
+        except (TypeError, ValueError, OverflowError, RecursionError):
+            # Still answer, so the client is not left waiting on a dead connection
+            logger.exception("❌ Could not encode response for %s", self.path)
+            status_code = 500
+            content_type = 'application/json'
+            body = self._ENCODE_ERROR_BODY
+        
         self.send_response(status_code)
-        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        if msgpack is not None:
+            self.send_header('Vary', 'Accept')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
         self.end_headers()
         
-        response = json.dumps(data, indent=2)
-        self.wfile.write(response.encode('utf-8'))
+        self.wfile.write(body)
+    
+    def send_invalid_body(self):
+        """Reject a request body that is not a usable JSON object"""
+        self.send_json_response({
+            'success': False,
+            'error': 'Invalid JSON body'
+        }, status_code=400)
+    
+    def send_invalid_value(self):
+        """Reject a well-formed body whose field has the wrong type or value"""
+        self.send_json_response({
+            'success': False,
+            'error': 'Invalid value'
+        }, status_code=400)
     
     def log_message(self, format, *args):
         """Custom logging to reduce noise"""
         pass  # Suppress default HTTP logging
 
-def run_server():
+class MockCppServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a listen backlog sized for polling dashboards"""
+    
+    # socketserver only queues 5 pending connections; a burst of clients
+    # (re)connecting their polling loops would stall on dropped SYNs
+    request_queue_size = 128
+
+def run_server(port=8081):
     """Start the mock C++ media server"""
-    server_address = ('localhost', 8081)
-    httpd = HTTPServer(server_address, MockCppHandler)
+    server_address = ('localhost', port)
+    logging.basicConfig(level=logging.WARNING)
+    httpd = MockCppServer(server_address, MockCppHandler)
     
     print('🎵 OneStopRadio C++ Media Server Mock (Python)')
     print('=' * 50)
-    print(f'🚀 Server running on http://localhost:8081')
+    print(f'🚀 Server running on http://localhost:{port}')
     print('')
     print('📡 Available endpoints:')
     print('  GET  /api/health - Health check')
     print('  GET  /api/stats - Server statistics')  
     print('  GET  /api/mixer/status - Mixer status')
     print('  GET  /api/mixer/microphone/status - Mic status')
+    print('  GET  /api/audio/levels - Audio levels')
+    print('  GET  /api/state - Mixer, mic and levels in one call')
     print('  POST /api/mixer/crossfader - Set crossfader')
     print('  POST /api/mixer/channel/{id}/volume - Channel volume')
     print('  POST /api/mixer/channel/{id}/load - Load track')
     print('  POST /api/mixer/channel/{id}/playback - Control playback')
     print('  POST /api/mixer/microphone/toggle - Toggle mic')
+    print('  POST /api/mixer/microphone/start - Start mic with gain')
+    print('  POST /api/mixer/microphone/stop - Stop mic')
+    print('  POST /api/mixer/microphone/gain - Set mic gain')
+    print('  POST /api/mixer/master/volume - Master volume')
     print('')
     print('✅ Ready for React frontend connections!')
     print('🔄 Simulating realistic DJ mixer behavior...')
+    print('🎤 Auto-talkover enabled when microphone starts')
     print('')
     print('Press Ctrl+C to stop server')
     